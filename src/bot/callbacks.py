@@ -150,13 +150,13 @@ async def show_account_detail(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
     
     emoji = get_country_emoji(account.country_code)
-    date_components = get_date_components(account.added_date)
+    date_components = get_date_components(account.added_date.isoformat())
     date_path = f"{date_components[0]}/{date_components[1]}/{date_components[2]}"
     
     await query.edit_message_text(
         f"{emoji} **{account.phone_number}**\n\n"
         f"🌍 **Country:** {account.country_name}\n"
-        f"📅 **Added:** {format_date_for_display(account.added_date)}\n"
+        f"📅 **Added:** {format_date_for_display(account.added_date.isoformat())}\n"
         f"📤 **Login Code Forwards:** {account.login_code_forwards}\n"
         f"🔐 **Status:** {'✅ Active' if account.is_active else '❌ Inactive'}",
         parse_mode='Markdown',
@@ -286,7 +286,7 @@ async def filter_by_date(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     await query.edit_message_text(
         f"{emoji} **{account.phone_number}**\n\n"
         f"🌍 **Country:** {account.country_name}\n"
-        f"📅 **Added:** {format_date_for_display(account.added_date)}\n"
+        f"📅 **Added:** {format_date_for_display(account.added_date.isoformat())}\n"
         f"📤 **Login Code Forwards:** {account.login_code_forwards}\n"
         f"🔐 **Status:** {'✅ Active' if account.is_active else '❌ Inactive'}",
         parse_mode='Markdown',
@@ -461,25 +461,24 @@ async def export_telethon(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     try:
         # Export sessions
-        zip_path = export_sessions_zip(session_files, format='telethon', count=None)
+        zip_buffer = export_sessions_zip(session_files, format='telethon', count=None)
         
         await query.edit_message_text(
             "✅ **Export Complete**\n\n"
             f"Exported **{len(session_files)}** session(s) in Telethon format.\n\n"
-            f"📦 **File:** `{zip_path.name}`",
+            f"📦 **File:** `{zip_buffer.name}`",
             parse_mode='Markdown'
         )
         
         # Send the file
-        with open(zip_path, 'rb') as f:
-            await context.bot.send_document(
-                chat_id=update.effective_chat.id,
-                document=f,
-                filename=zip_path.name,
-                caption=f"📦 Telethon Session Export\n\n"
-                        f"Accounts: {len(session_files)}\n"
-                        f"Format: Telethon (.session)"
-            )
+        await context.bot.send_document(
+            chat_id=update.effective_chat.id,
+            document=zip_buffer,
+            filename=zip_buffer.name,
+            caption=f"📦 Telethon Session Export\n\n"
+                    f"Accounts: {len(session_files)}\n"
+                    f"Format: Telethon (.session)"
+        )
         
     except Exception as e:
         logger.error(f"Export error: {e}")
@@ -521,7 +520,7 @@ async def export_pyrogram(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return
     
     try:
-        zip_path = export_sessions_zip(session_files, format='pyrogram', count=None)
+        zip_buffer = export_sessions_zip(session_files, format='pyrogram', count=None)
         
         await query.edit_message_text(
             "✅ **Export Complete**\n\n"
@@ -529,15 +528,14 @@ async def export_pyrogram(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             parse_mode='Markdown'
         )
         
-        with open(zip_path, 'rb') as f:
-            await context.bot.send_document(
-                chat_id=update.effective_chat.id,
-                document=f,
-                filename=zip_path.name,
-                caption=f"📦 Pyrogram Session Export\n\n"
-                        f"Accounts: {len(session_files)}\n"
-                        f"Format: Pyrogram (.session)"
-            )
+        await context.bot.send_document(
+            chat_id=update.effective_chat.id,
+            document=zip_buffer,
+            filename=zip_buffer.name,
+            caption=f"📦 Pyrogram Session Export\n\n"
+                    f"Accounts: {len(session_files)}\n"
+                    f"Format: Pyrogram (.session)"
+        )
     
     except Exception as e:
         logger.error(f"Export error: {e}")
@@ -567,7 +565,7 @@ async def export_with_stats(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return
     
     try:
-        zip_path = export_sessions_zip(
+        zip_buffer = export_sessions_zip(
             session_files if session_files else [],
             format='telethon',
             count=None,
@@ -582,15 +580,14 @@ async def export_with_stats(update: Update, context: ContextTypes.DEFAULT_TYPE)
             parse_mode='Markdown'
         )
         
-        with open(zip_path, 'rb') as f:
-            await context.bot.send_document(
-                chat_id=update.effective_chat.id,
-                document=f,
-                filename=zip_path.name,
-                caption=f"📊 Export with Statistics\n\n"
-                        f"Accounts: {stats.get('total_accounts', 0)}\n"
-                        f"Countries: {len(stats.get('by_country', {}))}"
-            )
+        await context.bot.send_document(
+            chat_id=update.effective_chat.id,
+            document=zip_buffer,
+            filename=zip_buffer.name,
+            caption=f"📊 Export with Statistics\n\n"
+                    f"Accounts: {stats.get('total_accounts', 0)}\n"
+                    f"Countries: {len(stats.get('by_country', {}))}"
+        )
     
     except Exception as e:
         logger.error(f"Export error: {e}")
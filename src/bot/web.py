@@ -2,9 +2,12 @@
 # Health check endpoint for Docker health checks
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from starlette.routing import Route
 import time
 
+import orjson
+
 app = FastAPI(
     title="Telegram Account Manager",
     description="Health check and metrics endpoint",
@@ -13,35 +16,43 @@ app = FastAPI(
 
 # Store startup time
 startup_time = time.time()
+_startup_monotonic = time.monotonic()
+
+# Pre-serialized response bodies; constant fields are encoded once and the
+# per-request fields are spliced in before the closing brace.
+_HEALTH_PREFIX = orjson.dumps({"status": "healthy", "startup": startup_time})[:-1]
+_READY_PREFIX = orjson.dumps({"status": "ready"})[:-1]
+_ROOT_BODY = orjson.dumps({
+    "service": "Telegram Account Manager Bot",
+    "status": "running",
+    "version": "1.0.0"
+})
 
 
-@app.get("/health")
-async def health_check():
+async def health_check(request: Request) -> Response:
     """Health check endpoint for Docker"""
-    return {
-        "status": "healthy",
-        "timestamp": time.time(),
-        "uptime": time.time() - startup_time
-    }
+    now = time.time()
+    uptime = time.monotonic() - _startup_monotonic
+    body = _HEALTH_PREFIX + b',"timestamp":%.3f,"uptime":%.3f}' % (now, uptime)
+    return Response(body, media_type="application/json")
 
 
-@app.get("/ready")
-async def readiness_check():
+async def readiness_check(request: Request) -> Response:
     """Readiness check endpoint"""
-    return {
-        "status": "ready",
-        "timestamp": time.time()
-    }
+    body = _READY_PREFIX + b',"timestamp":%.3f}' % time.time()
+    return Response(body, media_type="application/json")
+
+
+# Probes are mounted as plain Starlette routes ahead of the FastAPI routes so
+# they skip dependency injection and response validation entirely.
+app.router.routes.insert(0, Route("/health", health_check, methods=["GET"]))
+app.router.routes.insert(1, Route("/ready", readiness_check, methods=["GET"]))
 
 
 @app.get("/")
 async def root():
     """Root endpoint with basic info"""
-    return {
-        "service": "Telegram Account Manager Bot",
-        "status": "running",
-        "version": "1.0.0"
-    }
+    return Response(_ROOT_BODY, media_type="application/json")
 
 
 @app.exception_handler(Exception)
@@ -1,38 +1,10 @@
 # Models Package
 # __init__.py
 
-from .database import (
-    User,
-    TelegramAccount,
-    Proxy,
-    LoginCodeForward,
-    WhitelistEntry,
-    get_db,
-    init_db,
-    get_or_create_user,
-    get_user_by_telegram_id,
-    update_user,
-    add_account,
-    get_user_accounts,
-    get_user_accounts_by_country,
-    get_user_accounts_by_date,
-    get_user_countries,
-    get_user_dates_for_country,
-    delete_account,
-    get_user_stats,
-    add_proxy,
-    get_user_proxies,
-    delete_proxy,
-    check_user_whitelisted,
-    add_to_whitelist,
-    remove_from_whitelist,
-    get_whitelist,
-    load_whitelist_from_file
-)
-
 __all__ = [
     'User',
     'TelegramAccount',
+    'AccountSummary',
     'Proxy',
     'LoginCodeForward',
     'WhitelistEntry',
@@ -53,8 +25,17 @@ __all__ = [
     'get_user_proxies',
     'delete_proxy',
     'check_user_whitelisted',
+    'refresh_whitelist_cache',
     'add_to_whitelist',
     'remove_from_whitelist',
     'get_whitelist',
     'load_whitelist_from_file',
 ]
+
+
+def __getattr__(name):
+    """Import the database module lazily so importing the package stays cheap."""
+    if name in __all__:
+        from . import database
+        return getattr(database, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
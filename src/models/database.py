@@ -1,45 +1,70 @@
 # Telegram Account Management Bot - Database Models
 # PostgreSQL models with row-level security for multi-user isolation
 
+import functools
 import os
+import re
 import yaml
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from typing import Optional, List, Dict, Any
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON, Index, func
-from sqlalchemy.orm import sessionmaker, relationship, declarative_base
+from sqlalchemy import create_engine, String, Text, ForeignKey, Index, func, select, bindparam, event, DDL
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import sessionmaker, relationship, DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.pool import QueuePool
 
 
+# Possible locations for config.yaml and whitelist.txt, in priority order
+_CONFIG_CANDIDATES = (
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config.yaml'),  # /app/config.yaml
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.yaml'),  # /app/src/config.yaml
+    os.path.join(os.getcwd(), 'config.yaml'),  # cwd/config.yaml
+)
+_WHITELIST_CANDIDATES = (
+    '/app/data/whitelist.txt',  # Docker mount path
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'whitelist.txt'),
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'whitelist.txt'),
+)
+
+
+def _first_existing(candidates) -> Optional[str]:
+    """Return the first path in candidates that exists, or None"""
+    return next((p for p in candidates if os.path.exists(p)), None)
+
+
+# Resolved once; re-probed only while the file has not been found
+_CONFIG_PATH = _first_existing(_CONFIG_CANDIDATES)
+_WHITELIST_PATH = _first_existing(_WHITELIST_CANDIDATES)
+
+
 # Load configuration
 def load_config():
     """Load configuration from config.yaml"""
-    # Try multiple possible locations for config.yaml
-    possible_paths = [
-        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config.yaml'),  # /app/config.yaml
-        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.yaml'),  # /app/src/config.yaml
-        os.path.join(os.getcwd(), 'config.yaml'),  # cwd/config.yaml
-    ]
-    for config_path in possible_paths:
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                return yaml.safe_load(f) or {}
-    return {}
+    global _CONFIG_PATH
+    if _CONFIG_PATH is None:
+        _CONFIG_PATH = _first_existing(_CONFIG_CANDIDATES)
+        if _CONFIG_PATH is None:
+            return {}
+    with open(_CONFIG_PATH, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+
+_ENV_RE = re.compile(r'^\$\{([^}]+)\}$')
 
 
 def _resolve_env(value, default=None):
     """Resolve ${VAR} placeholders in config values using environment variables."""
-    if isinstance(value, str) and value.startswith('${') and value.endswith('}'):
-        env_var = value[2:-1]
-        return os.environ.get(env_var, default)
-    return value if value is not None else default
+    if type(value) is not str:
+        return value if value is not None else default
+    match = _ENV_RE.match(value)
+    return os.environ.get(match.group(1), default) if match else value
 
 
 config = load_config()
 
-# Database configuration
-DB_CONFIG = config.get('database', {})
+# Database configuration, with ${VAR} placeholders resolved once at load time
+DB_CONFIG = {key: _resolve_env(value) for key, value in (config.get('database') or {}).items()}
 TABLE_PREFIX = _resolve_env(DB_CONFIG.get('table_prefix'), 'telegram_account_manager_')
 
 # Database URL — resolve env var placeholders
@@ -49,20 +74,33 @@ db_host = _resolve_env(DB_CONFIG.get('host'), os.environ.get('DB_HOST', 'localho
 db_port = _resolve_env(DB_CONFIG.get('port'), os.environ.get('DB_PORT', '5432'))
 db_name = _resolve_env(DB_CONFIG.get('name'), os.environ.get('DB_NAME', 'telegram_accounts'))
 
+# Whitelist lookups are served from memory: the table is loaded by init_db()
+# and kept in sync by add_to_whitelist()/remove_from_whitelist().
+_WHITELIST_CACHE: set = set()
+_ADMIN_IDS = frozenset(str(uid) for uid in (config.get('whitelist') or {}).get('admin_ids') or [])
+
 DATABASE_URL = f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_recycle=1800,
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+@functools.lru_cache(maxsize=None)
+def _get_engine():
+    """Create the SQLAlchemy engine on first use"""
+    return create_engine(
+        DATABASE_URL,
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=10,
+        pool_timeout=30,
+        pool_recycle=1800,
+    )
+
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+class Base(DeclarativeBase):
+    """Declarative base for all models"""
+    pass
 
 
 # ============================================================================
@@ -72,20 +110,23 @@ Base = declarative_base()
 class User(Base):
     """User model for storing user information"""
     __tablename__ = f"{TABLE_PREFIX}users"
+    __mapper_args__ = {"eager_defaults": True}
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(String(50), unique=True, nullable=False, index=True)
-    username = Column(String(100), nullable=True)
-    first_name = Column(String(100), nullable=True)
-    last_name = Column(String(100), nullable=True)
-    is_admin = Column(Boolean, default=False)
-    is_whitelisted = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    telegram_id: Mapped[str] = mapped_column(String(50), unique=True, index=True)
+    username: Mapped[Optional[str]] = mapped_column(String(100))
+    first_name: Mapped[Optional[str]] = mapped_column(String(100))
+    last_name: Mapped[Optional[str]] = mapped_column(String(100))
+    is_admin: Mapped[bool] = mapped_column(default=False)
+    is_whitelisted: Mapped[bool] = mapped_column(default=True)
+    # Timestamps: default= renders now() into the INSERT itself, so tables
+    # created before the server defaults existed never get NULLs
+    created_at: Mapped[datetime] = mapped_column(default=func.now(), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(default=func.now(), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    accounts = relationship("TelegramAccount", back_populates="user", cascade="all, delete-orphan")
-    proxies = relationship("Proxy", back_populates="user", cascade="all, delete-orphan")
+    accounts: Mapped[List["TelegramAccount"]] = relationship(back_populates="user", cascade="all, delete-orphan")
+    proxies: Mapped[List["Proxy"]] = relationship(back_populates="user", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<User(telegram_id={self.telegram_id}, username={self.username})>"
@@ -94,68 +135,190 @@ class User(Base):
 class TelegramAccount(Base):
     """Telegram account model with date-based categorization"""
     __tablename__ = f"{TABLE_PREFIX}telegram_accounts"
+    __mapper_args__ = {"eager_defaults": True}
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey(f"{TABLE_PREFIX}users.id"), nullable=False, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey(f"{TABLE_PREFIX}users.id"), index=True)
     
     # Account information
-    phone_number = Column(String(20), nullable=False, index=True)
-    country_code = Column(String(10), nullable=False)  # ISO country code (US, IR, etc.)
-    country_name = Column(String(100), nullable=False)
+    phone_number: Mapped[str] = mapped_column(String(20), index=True)
+    country_code: Mapped[str] = mapped_column(String(10))  # ISO country code (US, IR, etc.)
+    country_name: Mapped[str] = mapped_column(String(100))
     
-    # Date-based categorization (YYYY/MM/DD)
-    added_date = Column(String(10), nullable=False)  # YYYY-MM-DD format
-    added_year = Column(String(4), nullable=False)
-    added_month = Column(String(2), nullable=False)
-    added_day = Column(String(2), nullable=False)
+    # Date-based categorization (YYYY/MM/DD derived from the DATE column)
+    added_date: Mapped[date] = mapped_column(server_default=func.current_date())
     
     # Session file
-    session_file = Column(String(255), nullable=True)
+    session_file: Mapped[Optional[str]] = mapped_column(String(255))
     
     # Account status
-    is_active = Column(Boolean, default=True)
-    last_login = Column(DateTime, nullable=True)
-    login_code_forwards = Column(Integer, default=0)  # Count of forwarded login codes
+    is_active: Mapped[bool] = mapped_column(default=True)
+    last_login: Mapped[Optional[datetime]] = mapped_column()
+    login_code_forwards: Mapped[int] = mapped_column(default=0)  # Count of forwarded login codes
     
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(default=func.now(), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(default=func.now(), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    user = relationship("User", back_populates="accounts")
+    user: Mapped["User"] = relationship(back_populates="accounts")
     
     # Indexes for efficient queries
     __table_args__ = (
         Index(f'ix_{TABLE_PREFIX}accounts_user_country', 'user_id', 'country_code'),
-        Index(f'ix_{TABLE_PREFIX}accounts_user_date', 'user_id', 'added_year', 'added_month', 'added_day'),
-        Index(f'ix_{TABLE_PREFIX}accounts_user_country_date', 'user_id', 'country_code', 'added_year', 'added_month', 'added_day'),
+        Index(f'ix_{TABLE_PREFIX}accounts_user_date', 'user_id', 'added_date'),
+        Index(f'ix_{TABLE_PREFIX}accounts_user_country_date', 'user_id', 'country_code', 'added_date'),
     )
     
     def __repr__(self):
         return f"<TelegramAccount(phone={self.phone_number}, country={self.country_code})>"
 
 
+# Migrate accounts tables created before added_date became a DATE column:
+# convert the YYYY-MM-DD strings, drop the added_year/month/day columns (which
+# also drops the old indexes on them) and build the (user, date) indexes.
+# Idempotent: does nothing once added_year is gone; runs after every create_all().
+_ADDED_DATE_MIGRATION_DDL = f"""
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = '{TABLE_PREFIX}telegram_accounts'
+          AND column_name = 'added_year'
+    ) THEN
+        DROP INDEX IF EXISTS ix_{TABLE_PREFIX}accounts_user_date;
+        DROP INDEX IF EXISTS ix_{TABLE_PREFIX}accounts_user_country_date;
+        ALTER TABLE {TABLE_PREFIX}telegram_accounts
+            ALTER COLUMN added_date TYPE DATE USING added_date::date,
+            ALTER COLUMN added_date SET DEFAULT CURRENT_DATE,
+            DROP COLUMN added_year,
+            DROP COLUMN added_month,
+            DROP COLUMN added_day;
+        CREATE INDEX IF NOT EXISTS ix_{TABLE_PREFIX}accounts_user_date
+            ON {TABLE_PREFIX}telegram_accounts (user_id, added_date);
+        CREATE INDEX IF NOT EXISTS ix_{TABLE_PREFIX}accounts_user_country_date
+            ON {TABLE_PREFIX}telegram_accounts (user_id, country_code, added_date);
+    END IF;
+END
+$$
+"""
+
+event.listen(Base.metadata, 'after_create', DDL(_ADDED_DATE_MIGRATION_DDL).execute_if(dialect='postgresql'))
+
+
+class AccountSummary(Base):
+    """Per-user, per-country count of active accounts (maintained by DB triggers)"""
+    __tablename__ = f"{TABLE_PREFIX}account_summary"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey(f"{TABLE_PREFIX}users.id", ondelete="CASCADE"), primary_key=True)
+    country_code: Mapped[str] = mapped_column(String(10), primary_key=True)
+    country_name: Mapped[str] = mapped_column(String(100))
+    account_count: Mapped[int] = mapped_column(default=0)
+    
+    def __repr__(self):
+        return f"<AccountSummary(user={self.user_id}, country={self.country_code}, count={self.account_count})>"
+
+
+# Keep account_summary in sync with the accounts table. The statements are
+# idempotent and run after every create_all(). The first one moves tables
+# created before the user FK cascaded onto ON DELETE CASCADE; the final
+# UPDATE and INSERT reconcile counts for rows that existed before the
+# trigger was installed.
+_ACCOUNT_SUMMARY_DDL = (
+    f"""
+    DO $$
+    DECLARE
+        fk_name name;
+    BEGIN
+        SELECT conname INTO fk_name FROM pg_constraint
+        WHERE conrelid = '{TABLE_PREFIX}account_summary'::regclass
+          AND contype = 'f'
+          AND confdeltype <> 'c';
+        IF fk_name IS NOT NULL THEN
+            EXECUTE 'ALTER TABLE {TABLE_PREFIX}account_summary DROP CONSTRAINT ' || quote_ident(fk_name);
+            ALTER TABLE {TABLE_PREFIX}account_summary
+                ADD CONSTRAINT {TABLE_PREFIX}account_summary_user_id_fkey
+                FOREIGN KEY (user_id) REFERENCES {TABLE_PREFIX}users (id) ON DELETE CASCADE;
+        END IF;
+    END
+    $$
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION {TABLE_PREFIX}upsert_account_summary() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            IF OLD.is_active THEN
+                UPDATE {TABLE_PREFIX}account_summary
+                SET account_count = account_count - 1
+                WHERE user_id = OLD.user_id AND country_code = OLD.country_code;
+            END IF;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            IF NEW.is_active THEN
+                INSERT INTO {TABLE_PREFIX}account_summary (user_id, country_code, country_name, account_count)
+                VALUES (NEW.user_id, NEW.country_code, NEW.country_name, 1)
+                ON CONFLICT (user_id, country_code) DO UPDATE
+                SET account_count = {TABLE_PREFIX}account_summary.account_count + 1,
+                    country_name = EXCLUDED.country_name;
+            END IF;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE TRIGGER {TABLE_PREFIX}account_summary_trg
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, country_code, country_name, is_active
+    ON {TABLE_PREFIX}telegram_accounts
+    FOR EACH ROW EXECUTE FUNCTION {TABLE_PREFIX}upsert_account_summary()
+    """,
+    f"""
+    UPDATE {TABLE_PREFIX}account_summary AS s
+    SET account_count = 0
+    WHERE s.account_count <> 0
+      AND NOT EXISTS (
+          SELECT 1 FROM {TABLE_PREFIX}telegram_accounts AS a
+          WHERE a.user_id = s.user_id AND a.country_code = s.country_code AND a.is_active
+      )
+    """,
+    f"""
+    INSERT INTO {TABLE_PREFIX}account_summary (user_id, country_code, country_name, account_count)
+    SELECT user_id, country_code, MAX(country_name), COUNT(*)
+    FROM {TABLE_PREFIX}telegram_accounts
+    WHERE is_active
+    GROUP BY user_id, country_code
+    ON CONFLICT (user_id, country_code) DO UPDATE
+    SET account_count = EXCLUDED.account_count, country_name = EXCLUDED.country_name
+    """,
+)
+
+for _statement in _ACCOUNT_SUMMARY_DDL:
+    event.listen(Base.metadata, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
 class Proxy(Base):
     """SOCKS5 proxy model for per-user proxy management"""
     __tablename__ = f"{TABLE_PREFIX}proxies"
+    __mapper_args__ = {"eager_defaults": True}
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey(f"{TABLE_PREFIX}users.id"), nullable=False, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey(f"{TABLE_PREFIX}users.id"), index=True)
     
     # Proxy configuration
-    host = Column(String(255), nullable=False)
-    port = Column(Integer, nullable=False)
-    username = Column(String(100), nullable=True)
-    password = Column(String(100), nullable=True)
+    host: Mapped[str] = mapped_column(String(255))
+    port: Mapped[int] = mapped_column()
+    username: Mapped[Optional[str]] = mapped_column(String(100))
+    password: Mapped[Optional[str]] = mapped_column(String(100))
     
     # Proxy metadata
-    is_active = Column(Boolean, default=True)
-    name = Column(String(100), nullable=True)  # Friendly name for the proxy
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    is_active: Mapped[bool] = mapped_column(default=True)
+    name: Mapped[Optional[str]] = mapped_column(String(100))  # Friendly name for the proxy
+    created_at: Mapped[datetime] = mapped_column(default=func.now(), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(default=func.now(), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    user = relationship("User", back_populates="proxies")
+    user: Mapped["User"] = relationship(back_populates="proxies")
     
     def __repr__(self):
         return f"<Proxy(host={self.host}, port={self.port})>"
@@ -164,16 +327,17 @@ class Proxy(Base):
 class LoginCodeForward(Base):
     """Log of forwarded login codes for statistics"""
     __tablename__ = f"{TABLE_PREFIX}login_code_forwards"
+    __mapper_args__ = {"eager_defaults": True}
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    account_id = Column(Integer, ForeignKey(f"{TABLE_PREFIX}telegram_accounts.id"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey(f"{TABLE_PREFIX}users.id"), nullable=False, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    account_id: Mapped[int] = mapped_column(ForeignKey(f"{TABLE_PREFIX}telegram_accounts.id"), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey(f"{TABLE_PREFIX}users.id"), index=True)
     
     # Forward details
-    forwarded_at = Column(DateTime, default=datetime.utcnow)
-    target_chat_id = Column(String(50), nullable=True)
-    success = Column(Boolean, default=True)
-    error_message = Column(Text, nullable=True)
+    forwarded_at: Mapped[datetime] = mapped_column(default=func.now(), server_default=func.now())
+    target_chat_id: Mapped[Optional[str]] = mapped_column(String(50))
+    success: Mapped[bool] = mapped_column(default=True)
+    error_message: Mapped[Optional[str]] = mapped_column(Text)
     
     def __repr__(self):
         return f"<LoginCodeForward(account={self.account_id}, success={self.success})>"
@@ -182,13 +346,14 @@ class LoginCodeForward(Base):
 class WhitelistEntry(Base):
     """Whitelist of approved Telegram user IDs"""
     __tablename__ = f"{TABLE_PREFIX}whitelist"
+    __mapper_args__ = {"eager_defaults": True}
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(String(50), unique=True, nullable=False, index=True)
-    username = Column(String(100), nullable=True)
-    added_by = Column(String(50), nullable=True)
-    added_at = Column(DateTime, default=datetime.utcnow)
-    notes = Column(Text, nullable=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    telegram_id: Mapped[str] = mapped_column(String(50), unique=True, index=True)
+    username: Mapped[Optional[str]] = mapped_column(String(100))
+    added_by: Mapped[Optional[str]] = mapped_column(String(50))
+    added_at: Mapped[datetime] = mapped_column(default=func.now(), server_default=func.now())
+    notes: Mapped[Optional[str]] = mapped_column(Text)
     
     def __repr__(self):
         return f"<WhitelistEntry(telegram_id={self.telegram_id})>"
@@ -198,10 +363,16 @@ class WhitelistEntry(Base):
 # Database Operations
 # ============================================================================
 
+# Hot lookups built once and reused, so SQLAlchemy's compiled cache is hit
+# with the same construct on every call
+_USER_BY_TELEGRAM_ID = select(User).where(User.telegram_id == bindparam('telegram_id'))
+_WHITELIST_BY_TELEGRAM_ID = select(WhitelistEntry).where(WhitelistEntry.telegram_id == bindparam('telegram_id'))
+
+
 @contextmanager
 def get_db():
     """Context manager for database sessions"""
-    db = SessionLocal()
+    db = SessionLocal(bind=_get_engine())
     try:
         yield db
         db.commit()
@@ -214,7 +385,9 @@ def get_db():
 
 def init_db():
     """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=_get_engine())
+    
+    refresh_whitelist_cache()
     
     # Load whitelist from file if exists
     load_whitelist_from_file()
@@ -222,27 +395,26 @@ def init_db():
 
 def load_whitelist_from_file():
     """Load whitelist from config file"""
-    # Try multiple possible locations for whitelist.txt
-    possible_paths = [
-        '/app/data/whitelist.txt',  # Docker mount path
-        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'whitelist.txt'),
-        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'whitelist.txt'),
-    ]
-    whitelist_path = None
-    for p in possible_paths:
-        if os.path.exists(p):
-            whitelist_path = p
-            break
-    if whitelist_path is None:
+    global _WHITELIST_PATH
+    if _WHITELIST_PATH is None:
+        _WHITELIST_PATH = _first_existing(_WHITELIST_CANDIDATES)
+        if _WHITELIST_PATH is None:
+            return
+    
+    with open(_WHITELIST_PATH, 'r') as f:
+        telegram_ids = {line.strip() for line in f if line.strip().isdigit()}
+    if not telegram_ids:
         return
     
-    with open(whitelist_path, 'r') as f:
-        for line in f:
-            telegram_id = line.strip()
-            if telegram_id and telegram_id.isdigit():
-                # Add to whitelist if not exists
-                if not check_user_whitelisted(int(telegram_id)):
-                    add_to_whitelist(int(telegram_id))
+    # Single INSERT ... ON CONFLICT DO NOTHING instead of a lookup + insert per line
+    with get_db() as db:
+        db.execute(
+            pg_insert(WhitelistEntry)
+            .values([{'telegram_id': tid} for tid in telegram_ids])
+            .on_conflict_do_nothing(index_elements=['telegram_id'])
+        )
+    
+    _WHITELIST_CACHE.update(telegram_ids)
 
 
 # ============================================================================
@@ -252,7 +424,7 @@ def load_whitelist_from_file():
 def get_or_create_user(telegram_id: int, username: str = None, first_name: str = None, last_name: str = None) -> User:
     """Get or create a user"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         
         if not user:
             user = User(
@@ -272,13 +444,13 @@ def get_or_create_user(telegram_id: int, username: str = None, first_name: str =
 def get_user_by_telegram_id(telegram_id: int) -> Optional[User]:
     """Get user by Telegram ID"""
     with get_db() as db:
-        return db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        return db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
 
 
 def update_user(telegram_id: int, **kwargs) -> Optional[User]:
     """Update user information"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         if user:
             for key, value in kwargs.items():
                 if hasattr(user, key):
@@ -297,37 +469,26 @@ def add_account(
     country_code: str,
     country_name: str,
     added_date: str = None,
-    added_year: str = None,
-    added_month: str = None,
-    added_day: str = None,
     session_file: str = None
 ) -> TelegramAccount:
-    """Add a new Telegram account for a user"""
+    """Add a new Telegram account for a user (added_date defaults to the DB's current date)"""
     with get_db() as db:
         # Get user
-        user = db.query(User).filter(User.telegram_id == str(user_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(user_id)}).first()
         if not user:
             raise ValueError(f"User with telegram_id {user_id} not found")
         
-        # Set date if not provided
-        if added_date is None:
-            now = datetime.utcnow()
-            added_date = now.strftime('%Y-%m-%d')
-            added_year = str(now.year)
-            added_month = str(now.month).zfill(2)
-            added_day = str(now.day).zfill(2)
-        
         account = TelegramAccount(
             user_id=user.id,
             phone_number=phone_number,
             country_code=country_code,
             country_name=country_name,
-            added_date=added_date,
-            added_year=added_year,
-            added_month=added_month,
-            added_day=added_day,
             session_file=session_file
         )
+        if added_date is not None:
+            if isinstance(added_date, str):
+                added_date = date.fromisoformat(added_date)
+            account.added_date = added_date
         
         db.add(account)
         db.flush()
@@ -337,28 +498,46 @@ def add_account(
 def get_user_accounts(telegram_id: int) -> List[TelegramAccount]:
     """Get all accounts for a user (data isolation)"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         if not user:
             return []
         
-        return db.query(TelegramAccount).filter(
+        return db.scalars(select(TelegramAccount).where(
             TelegramAccount.user_id == user.id,
             TelegramAccount.is_active == True
-        ).all()
+        )).all()
 
 
 def get_user_accounts_by_country(telegram_id: int, country_code: str) -> List[TelegramAccount]:
     """Get accounts for a user filtered by country"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         if not user:
             return []
         
-        return db.query(TelegramAccount).filter(
+        return db.scalars(select(TelegramAccount).where(
             TelegramAccount.user_id == user.id,
             TelegramAccount.country_code == country_code,
             TelegramAccount.is_active == True
-        ).all()
+        )).all()
+
+
+def _date_range(year: str = None, month: str = None, day: str = None) -> Optional[tuple]:
+    """Convert year/month/day filter components into a half-open [start, end) date range
+    
+    Returns None when the components don't describe one contiguous range (no
+    year, or a day without a month); raises ValueError for impossible dates.
+    """
+    if not year or (day and not month):
+        return None
+    y = int(year)
+    if not month:
+        return date(y, 1, 1), date(y + 1, 1, 1)
+    m = int(month)
+    if not day:
+        return date(y, m, 1), date(y + (m == 12), m % 12 + 1, 1)
+    start = date(y, m, int(day))
+    return start, start + timedelta(days=1)
 
 
 def get_user_accounts_by_date(
@@ -370,39 +549,52 @@ def get_user_accounts_by_date(
 ) -> List[TelegramAccount]:
     """Get accounts for a user filtered by date components"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         if not user:
             return []
         
-        query = db.query(TelegramAccount).filter(
+        stmt = select(TelegramAccount).where(
             TelegramAccount.user_id == user.id,
             TelegramAccount.is_active == True
         )
         
         if country_code:
-            query = query.filter(TelegramAccount.country_code == country_code)
-        if year:
-            query = query.filter(TelegramAccount.added_year == year)
-        if month:
-            query = query.filter(TelegramAccount.added_month == month)
-        if day:
-            query = query.filter(TelegramAccount.added_day == day)
+            stmt = stmt.where(TelegramAccount.country_code == country_code)
+        
+        try:
+            date_range = _date_range(year, month, day)
+            if date_range:
+                # Half-open range keeps the predicate SARGable on the (user, date) indexes
+                stmt = stmt.where(
+                    TelegramAccount.added_date >= date_range[0],
+                    TelegramAccount.added_date < date_range[1]
+                )
+            else:
+                if year:
+                    stmt = stmt.where(func.extract('year', TelegramAccount.added_date) == int(year))
+                if month:
+                    stmt = stmt.where(func.extract('month', TelegramAccount.added_date) == int(month))
+                if day:
+                    stmt = stmt.where(func.extract('day', TelegramAccount.added_date) == int(day))
+        except ValueError:
+            # Impossible or malformed components (e.g. day 30 of month 02) match nothing
+            return []
         
-        return query.all()
+        return db.scalars(stmt).all()
 
 
 def get_user_countries(telegram_id: int) -> List[str]:
     """Get list of countries with accounts for a user (hides empty categories)"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         if not user:
             return []
         
-        # Get distinct countries with active accounts
-        results = db.query(TelegramAccount.country_code, TelegramAccount.country_name).filter(
-            TelegramAccount.user_id == user.id,
-            TelegramAccount.is_active == True
-        ).distinct().all()
+        # Read from the trigger-maintained summary instead of a DISTINCT over accounts
+        results = db.execute(select(AccountSummary.country_code, AccountSummary.country_name).where(
+            AccountSummary.user_id == user.id,
+            AccountSummary.account_count > 0
+        )).all()
         
         return [(r.country_code, r.country_name) for r in results]
 
@@ -410,35 +602,31 @@ def get_user_countries(telegram_id: int) -> List[str]:
 def get_user_dates_for_country(telegram_id: int, country_code: str) -> List[str]:
     """Get list of dates (YYYY/MM/DD) for a user's accounts in a country"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         if not user:
             return []
         
         # Get distinct dates with accounts
-        results = db.query(
-            TelegramAccount.added_year,
-            TelegramAccount.added_month,
-            TelegramAccount.added_day
-        ).filter(
+        results = db.scalars(select(TelegramAccount.added_date).where(
             TelegramAccount.user_id == user.id,
             TelegramAccount.country_code == country_code,
             TelegramAccount.is_active == True
-        ).distinct().all()
+        ).distinct()).all()
         
-        return [f"{r.added_year}/{r.added_month}/{r.added_day}" for r in results]
+        return [d.strftime('%Y/%m/%d') for d in results]
 
 
 def delete_account(telegram_id: int, account_id: int) -> bool:
     """Delete (deactivate) an account"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         if not user:
             return False
         
-        account = db.query(TelegramAccount).filter(
+        account = db.scalars(select(TelegramAccount).where(
             TelegramAccount.id == account_id,
             TelegramAccount.user_id == user.id
-        ).first()
+        )).first()
         
         if account:
             account.is_active = False
@@ -453,39 +641,39 @@ def delete_account(telegram_id: int, account_id: int) -> bool:
 def get_user_stats(telegram_id: int) -> Dict[str, Any]:
     """Get statistics for a user"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         if not user:
             return {}
         
         # Total accounts
-        total_accounts = db.query(TelegramAccount).filter(
+        total_accounts = db.scalar(select(func.count(TelegramAccount.id)).where(
             TelegramAccount.user_id == user.id,
             TelegramAccount.is_active == True
-        ).count()
+        ))
         
         # Accounts by country
-        country_stats = db.query(
+        country_stats = db.execute(select(
             TelegramAccount.country_code,
             TelegramAccount.country_name,
             func.count(TelegramAccount.id)
-        ).filter(
+        ).where(
             TelegramAccount.user_id == user.id,
             TelegramAccount.is_active == True
-        ).group_by(TelegramAccount.country_code, TelegramAccount.country_name).all()
+        ).group_by(TelegramAccount.country_code, TelegramAccount.country_name)).all()
         
         # Accounts by date
-        date_stats = db.query(
+        date_stats = db.execute(select(
             TelegramAccount.added_date,
             func.count(TelegramAccount.id)
-        ).filter(
+        ).where(
             TelegramAccount.user_id == user.id,
             TelegramAccount.is_active == True
-        ).group_by(TelegramAccount.added_date).all()
+        ).group_by(TelegramAccount.added_date)).all()
         
         return {
             'total_accounts': total_accounts,
             'by_country': {f"{c[0]} ({c[1]})": c[2] for c in country_stats},
-            'by_date': {d[0]: d[1] for d in date_stats}
+            'by_date': {d[0].isoformat(): d[1] for d in date_stats}
         }
 
 
@@ -503,7 +691,7 @@ def add_proxy(
 ) -> Proxy:
     """Add a proxy for a user"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         if not user:
             raise ValueError(f"User with telegram_id {telegram_id} not found")
         
@@ -524,27 +712,27 @@ def add_proxy(
 def get_user_proxies(telegram_id: int) -> List[Proxy]:
     """Get all proxies for a user"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         if not user:
             return []
         
-        return db.query(Proxy).filter(
+        return db.scalars(select(Proxy).where(
             Proxy.user_id == user.id,
             Proxy.is_active == True
-        ).all()
+        )).all()
 
 
 def delete_proxy(telegram_id: int, proxy_id: int) -> bool:
     """Delete (deactivate) a proxy"""
     with get_db() as db:
-        user = db.query(User).filter(User.telegram_id == str(telegram_id)).first()
+        user = db.scalars(_USER_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         if not user:
             return False
         
-        proxy = db.query(Proxy).filter(
+        proxy = db.scalars(select(Proxy).where(
             Proxy.id == proxy_id,
             Proxy.user_id == user.id
-        ).first()
+        )).first()
         
         if proxy:
             proxy.is_active = False
@@ -556,30 +744,25 @@ def delete_proxy(telegram_id: int, proxy_id: int) -> bool:
 # Whitelist Operations
 # ============================================================================
 
-def check_user_whitelisted(telegram_id: int) -> bool:
-    """Check if a user is whitelisted"""
+def refresh_whitelist_cache():
+    """Reload the in-memory whitelist from the database"""
     with get_db() as db:
-        # Check if user exists in whitelist table
-        whitelist_entry = db.query(WhitelistEntry).filter(
-            WhitelistEntry.telegram_id == str(telegram_id)
-        ).first()
-        
-        if whitelist_entry:
-            return True
-        
-        # Also check config file whitelist
-        config = load_config()
-        admin_ids = config.get('whitelist', {}).get('admin_ids', [])
-        
-        return str(telegram_id) in [str(uid) for uid in admin_ids]
+        telegram_ids = db.scalars(select(WhitelistEntry.telegram_id)).all()
+    
+    _WHITELIST_CACHE.clear()
+    _WHITELIST_CACHE.update(telegram_ids)
+
+
+def check_user_whitelisted(telegram_id: int) -> bool:
+    """Check if a user is whitelisted (whitelist table or config admin IDs)"""
+    telegram_id = str(telegram_id)
+    return telegram_id in _WHITELIST_CACHE or telegram_id in _ADMIN_IDS
 
 
 def add_to_whitelist(telegram_id: int, username: str = None, added_by: str = None, notes: str = None):
     """Add a user to the whitelist"""
     with get_db() as db:
-        existing = db.query(WhitelistEntry).filter(
-            WhitelistEntry.telegram_id == str(telegram_id)
-        ).first()
+        existing = db.scalars(_WHITELIST_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         
         if not existing:
             entry = WhitelistEntry(
@@ -589,25 +772,28 @@ def add_to_whitelist(telegram_id: int, username: str = None, added_by: str = Non
                 notes=notes
             )
             db.add(entry)
+    
+    _WHITELIST_CACHE.add(str(telegram_id))
 
 
 def remove_from_whitelist(telegram_id: int) -> bool:
     """Remove a user from the whitelist"""
     with get_db() as db:
-        entry = db.query(WhitelistEntry).filter(
-            WhitelistEntry.telegram_id == str(telegram_id)
-        ).first()
+        entry = db.scalars(_WHITELIST_BY_TELEGRAM_ID, {'telegram_id': str(telegram_id)}).first()
         
         if entry:
             db.delete(entry)
-            return True
-        return False
+        else:
+            return False
+    
+    _WHITELIST_CACHE.discard(str(telegram_id))
+    return True
 
 
 def get_whitelist() -> List[WhitelistEntry]:
     """Get all whitelisted users"""
     with get_db() as db:
-        return db.query(WhitelistEntry).all()
+        return db.scalars(select(WhitelistEntry)).all()
 
 
 # func is imported at the top with other sqlalchemy imports
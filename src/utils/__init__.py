@@ -12,6 +12,7 @@ from .country import (
     get_country_detector,
 )
 from .proxy import (
+    ProxyConfig,
     validate_proxy,
     parse_proxy_string,
     create_proxy_url
@@ -22,9 +23,14 @@ from .sessions import (
     export_telethon_format,
     export_pyrogram_format
 )
-from .config import Config, config, load_config
+from .config import Config, load_config
+
+# The import above binds the ``utils.config`` submodule as ``config``; drop it
+# so ``utils.config`` resolves to the Config instance through __getattr__
+del globals()['config']
 from .dates import (
     get_today_date,
+    get_today_parts,
     format_date,
     parse_date_string,
     get_date_components
@@ -39,6 +45,7 @@ __all__ = [
     'format_phone_display',
     'get_country_info',
     'get_country_detector',
+    'ProxyConfig',
     'validate_proxy',
     'parse_proxy_string',
     'create_proxy_url',
@@ -47,6 +54,7 @@ __all__ = [
     'export_telethon_format',
     'export_pyrogram_format',
     'get_today_date',
+    'get_today_parts',
     'format_date',
     'parse_date_string',
     'get_date_components',
@@ -54,3 +62,10 @@ __all__ = [
     'config',
     'load_config',
 ]
+
+
+def __getattr__(name):
+    """Resolve the ``config`` singleton lazily."""
+    if name == 'config':
+        return Config.instance()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
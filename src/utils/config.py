@@ -4,6 +4,7 @@ Telegram Account Manager - Configuration Loader
 Loads configuration from config.yaml and supports environment variable overrides.
 """
 
+import functools
 import os
 from pathlib import Path
 from typing import Any, Optional
@@ -11,6 +12,23 @@ from typing import Any, Optional
 import yaml
 
 
+@functools.lru_cache(maxsize=None)
+def _env_key(key: str) -> str:
+    """Map a dot-notation key to its environment variable name."""
+    return key.upper().replace(".", "_")
+
+
+def _flatten(data: dict, prefix: str = "") -> dict:
+    """Flatten nested config into {"a.b.c": value}, keeping intermediate dicts."""
+    flat = {}
+    for k, v in data.items():
+        path = f"{prefix}{k}"
+        flat[path] = v
+        if isinstance(v, dict):
+            flat.update(_flatten(v, f"{path}."))
+    return flat
+
+
 class Config:
     """
     Configuration manager that loads from YAML and supports env overrides.
@@ -23,6 +41,7 @@ class Config:
     
     _instance: Optional["Config"] = None
     _config: dict = {}
+    _flat: dict = {}
     
     def __new__(cls) -> "Config":
         """Singleton pattern to ensure single config instance."""
@@ -31,6 +50,11 @@ class Config:
             cls._instance._load_config()
         return cls._instance
     
+    @classmethod
+    def instance(cls) -> "Config":
+        """Return the singleton, loading config.yaml on first use."""
+        return cls._instance or cls()
+    
     def _load_config(self) -> None:
         """Load configuration from config.yaml."""
         config_path = Path(__file__).parent.parent.parent / "config.yaml"
@@ -40,6 +64,8 @@ class Config:
                 self._config = yaml.safe_load(f) or {}
         else:
             self._config = {}
+        
+        self._flat = _flatten(self._config)
     
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -57,23 +83,12 @@ class Config:
             config.get("database.port", 5432)  # Returns 5432 or default
         """
         # Check for environment variable override first
-        env_key = key.upper().replace(".", "_")
-        env_value = os.environ.get(env_key)
+        env_value = os.environ.get(_env_key(key))
         if env_value is not None:
             # Try to parse as the right type
             return self._parse_env_value(env_value, default)
         
-        # Navigate the config dictionary
-        keys = key.split(".")
-        value = self._config
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        
-        return value
+        return self._flat.get(key, default)
     
     def _parse_env_value(self, env_value: str, default: Any) -> Any:
         """Parse environment variable string to appropriate type."""
@@ -114,6 +129,7 @@ class Config:
             config = config[k]
         
         config[keys[-1]] = value
+        self._flat = _flatten(self._config)
     
     def reload(self) -> None:
         """Reload configuration from file."""
@@ -125,8 +141,11 @@ class Config:
         return self._config.copy()
 
 
-# Global config instance
-config = Config()
+def __getattr__(name: str) -> Any:
+    """Create the global ``config`` instance on first access."""
+    if name == "config":
+        return Config.instance()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def load_config(config_path: Optional[str] = None) -> dict:
@@ -5,13 +5,47 @@ Automatically detects country from phone number using libphonenumber.
 Supports hiding empty categories by tracking countries with actual accounts.
 """
 
-from typing import Optional
+import functools
+import types
+from typing import TYPE_CHECKING, Optional, Tuple
 
-import phonenumbers
-from phonenumbers import PhoneNumberFormat
-from phonenumbers import geocoder
-from phonenumbers import NumberParseException
-from phonenumbers import PhoneNumber
+if TYPE_CHECKING:
+    from phonenumbers import PhoneNumber
+
+
+@functools.cache
+def _get_phonenumbers():
+    """
+    Import libphonenumber on first use.
+    
+    The geocoder pulls in large metadata tables, so the import cost is only
+    paid by code paths that actually parse numbers.
+    
+    Returns:
+        Tuple of (phonenumbers module, phonenumbers.geocoder module)
+    """
+    import phonenumbers
+    from phonenumbers import geocoder
+    return phonenumbers, geocoder
+
+
+def _build_prefix_trie(country_codes: dict) -> dict:
+    """
+    Build a digit trie over dialing codes for longest-prefix matching.
+    
+    Args:
+        country_codes: Mapping of "+<code>" to country name
+        
+    Returns:
+        Nested dict keyed by digit; a "$" key holds (code, country name)
+    """
+    trie: dict = {}
+    for code, name in country_codes.items():
+        node = trie
+        for digit in code.lstrip("+"):
+            node = node.setdefault(digit, {})
+        node["$"] = (code, name)
+    return trie
 
 
 class CountryDetector:
@@ -34,6 +68,9 @@ class CountryDetector:
         "807", "819", "825", "867", "873", "902", "905"
     })
     
+    # Same set as a bitmask over area codes 200-999 (bit n = area code 200 + n)
+    _CA_AREA_MASK = sum(1 << (int(code) - 200) for code in CANADIAN_AREA_CODES)
+    
     # Common country code mappings for quick reference
     COUNTRY_CODES = {
         "+1": "North America (+1)",  # Special: distinguishes US/Canada by area code
@@ -127,12 +164,12 @@ class CountryDetector:
         "+258": "Mozambique",
         "+260": "Zambia",
         "+261": "Madagascar",
-        "+262": "Mayotte",
+        "+262": "Reunion",
         "+263": "Zimbabwe",
         "+264": "Namibia",
         "+265": "Malawi",
         "+266": "Lesotho",
-        "+267": "Eswatini",
+        "+267": "Botswana",
         "+268": "Eswatini",
         "+269": "Comoros",
         "+290": "Saint Helena",
@@ -245,6 +282,12 @@ class CountryDetector:
         "+998": "Uzbekistan",
     }
     
+    # Separators stripped from phone input in a single translate() pass
+    _CLEAN_TABLE = str.maketrans("", "", " -\t\r\n()")
+    
+    # Digit trie over COUNTRY_CODES for longest-prefix dialing code lookups
+    _PREFIX_TRIE = _build_prefix_trie(COUNTRY_CODES)
+    
     # Emoji mapping for countries
     COUNTRY_EMOJIS = {
         "United States": "🇺🇸",
@@ -276,6 +319,21 @@ class CountryDetector:
         "United Arab Emirates": "🇦🇪",
     }
     
+    # COUNTRY_CODES keyed by the integer code libphonenumber hands back
+    _COUNTRY_CODES_INT = {int(code[1:]): name for code, name in COUNTRY_CODES.items()}
+    
+    # Shared read-only result for numbers that fail to parse
+    _INVALID_BASE = types.MappingProxyType({
+        "country_code": "",
+        "country_name": "Unknown",
+        "national_number": "",
+        "is_valid": False,
+        "emoji": "🌍",
+        "region_code": "",
+        "is_mobile": False,
+        "formatted": "",
+    })
+    
     def __init__(self, language: str = "en"):
         """
         Initialize the country detector.
@@ -284,6 +342,10 @@ class CountryDetector:
             language: Language for country name translation (default: English)
         """
         self.language = language
+        
+        # Memoized detection keyed on the cleaned number; phone numbers repeat
+        # heavily across list renders and UI refreshes
+        self._detect_cached = functools.lru_cache(maxsize=4096)(self._detect_clean)
     
     def detect(self, phone_number: str) -> dict:
         """
@@ -304,44 +366,72 @@ class CountryDetector:
             }
         """
         # Clean the phone number
-        clean_number = phone_number.strip().replace(" ", "").replace("-", "")
+        clean_number = phone_number.translate(self._CLEAN_TABLE).strip()
         
         # Add + if not present
         if not clean_number.startswith("+"):
             clean_number = "+" + clean_number
         
+        result = self._detect_cached(clean_number)
+        if not result["is_valid"]:
+            if not phone_number:
+                return self._INVALID_BASE
+            return {**self._INVALID_BASE, "formatted": phone_number}
+        
+        # Copy so callers cannot mutate the cached entry
+        return dict(result)
+    
+    def _detect_clean(self, clean_number: str) -> dict:
+        """
+        Detect country from an already-cleaned phone number (uncached).
+        
+        Args:
+            clean_number: Phone number with leading "+" and no separators
+            
+        Returns:
+            Country information dictionary (see detect)
+        """
+        phonenumbers, geocoder = _get_phonenumbers()
+        
         try:
             # Parse the phone number
-            parsed: PhoneNumber = phonenumbers.parse(clean_number, None)
+            parsed: "PhoneNumber" = phonenumbers.parse(clean_number, None)
             
             # Extract country code and national number
             country_code = f"+{parsed.country_code}"
             national_number = str(parsed.national_number)
             
+            # Get region code
+            region_code = phonenumbers.region_code_for_number(parsed)
+            
             # Special handling for +1 (US and Canada)
-            if country_code == "+1":
+            if parsed.country_code == 1:
                 # Extract area code (first 3 digits of national number)
-                area_code = national_number[:3] if len(national_number) >= 3 else ""
-                if area_code in self.CANADIAN_AREA_CODES:
+                area_code = int(national_number[:3]) if len(national_number) >= 3 else 0
+                if area_code >= 200 and (self._CA_AREA_MASK >> (area_code - 200)) & 1:
                     country_name = "Canada"
                 else:
                     country_name = "United States"
             else:
-                # Get country name from libphonenumber
-                country_name = geocoder.description_for_number(
-                    parsed, 
-                    self.language
-                )
+                # Fast path: the dialing code table names the country when the
+                # number belongs to the code's main region. Shared codes
+                # (e.g. +7 Kazakhstan, +44 Jersey) still go to the geocoder.
+                country_name = None
+                if (self.language == "en"
+                        and region_code == phonenumbers.region_code_for_country_code(parsed.country_code)):
+                    country_name = self._verified_names().get(parsed.country_code)
+                
+                if not country_name:
+                    # Get country name from libphonenumber
+                    country_name = geocoder.description_for_number(
+                        parsed, 
+                        self.language
+                    )
                 
                 # Fallback to our mapping if libphonenumber doesn't have it
                 if not country_name or country_name == "Unknown":
-                    country_name = self.COUNTRY_CODES.get(
-                        country_code, 
-                        f"Unknown ({country_code})"
-                    )
-            
-            # Get region code
-            region_code = phonenumbers.region_code_for_number(parsed)
+                    country_name = (self._COUNTRY_CODES_INT.get(parsed.country_code)
+                                    or f"Unknown ({country_code})")
             
             # Determine if it's a mobile or fixed line
             phone_type = phonenumbers.number_type(parsed)
@@ -353,26 +443,101 @@ class CountryDetector:
                 "country_name": country_name,
                 "national_number": national_number,
                 "is_valid": True,
-                "emoji": self.COUNTRY_EMOJIS.get(country_name, "🌍"),
+                "emoji": (self.COUNTRY_EMOJIS.get(country_name)
+                          or self._flag_from_region(region_code)),
                 "region_code": region_code,
                 "is_mobile": is_mobile,
                 "formatted": self.format_number(parsed),
             }
             
-        except NumberParseException:
+        except phonenumbers.NumberParseException:
             # Return invalid result
-            return {
-                "country_code": "",
-                "country_name": "Unknown",
-                "national_number": "",
-                "is_valid": False,
-                "emoji": "🌍",
-                "region_code": "",
-                "is_mobile": False,
-                "formatted": phone_number,
-            }
+            return self._INVALID_BASE
+    
+    @classmethod
+    @functools.cache
+    def _verified_names(cls) -> dict:
+        """
+        COUNTRY_CODES names that agree with libphonenumber's main region.
+        
+        Built once on first use. Entries whose name differs from the
+        geocoder's name for the code's main region (other than by case)
+        are left out, so a wrong table entry cannot override libphonenumber.
+        
+        Returns:
+            Dictionary of integer dialing code -> country name
+        """
+        phonenumbers, geocoder = _get_phonenumbers()
+        
+        verified = {}
+        for code, name in cls._COUNTRY_CODES_INT.items():
+            region = phonenumbers.region_code_for_country_code(code)
+            example = phonenumbers.example_number(region)
+            if example is None:
+                continue
+            if geocoder.country_name_for_number(example, "en").casefold() == name.casefold():
+                verified[code] = name
+        return verified
+    
+    @classmethod
+    @functools.cache
+    def _code_emojis(cls) -> dict:
+        """
+        Emoji for each dialing code, chosen the same way as in detect().
+        
+        COUNTRY_EMOJIS wins for the table's country; otherwise the flag of the
+        code's main region. Built once on first use.
+        
+        Returns:
+            Dictionary of "+<code>" -> emoji
+        """
+        phonenumbers, _ = _get_phonenumbers()
+        return {
+            code: (cls.COUNTRY_EMOJIS.get(name)
+                   or cls._flag_from_region(phonenumbers.region_code_for_country_code(int(code[1:]))))
+            for code, name in cls.COUNTRY_CODES.items()
+        }
     
-    def format_number(self, phone: PhoneNumber) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _flag_from_region(region_code: Optional[str]) -> str:
+        """
+        Build the flag emoji for an ISO 3166 region code.
+        
+        Each letter maps to its regional indicator symbol, so every region
+        libphonenumber knows gets a flag without growing COUNTRY_EMOJIS.
+        
+        Args:
+            region_code: Two-letter region code (e.g. "DE")
+            
+        Returns:
+            Flag emoji, or the globe emoji for missing/non-geographic regions
+        """
+        if not region_code or len(region_code) != 2 or not region_code.isalpha():
+            return "🌍"
+        return "".join(chr(0x1F1E6 + ord(c) - ord("A")) for c in region_code.upper())
+    
+    @classmethod
+    def _match_prefix(cls, digits: str) -> Optional[Tuple[str, str]]:
+        """
+        Find the longest dialing code that prefixes a digit string.
+        
+        Args:
+            digits: Digits without the leading "+" (e.g., "98912...", "1905")
+            
+        Returns:
+            Tuple of ("+<code>", country name), or None if nothing matches
+        """
+        node = cls._PREFIX_TRIE
+        match = None
+        for digit in digits:
+            node = node.get(digit)
+            if node is None:
+                break
+            match = node.get("$", match)
+        return match
+    
+    def format_number(self, phone: "PhoneNumber") -> str:
         """
         Format phone number in international format.
         
@@ -382,9 +547,10 @@ class CountryDetector:
         Returns:
             Formatted phone number string
         """
+        phonenumbers, _ = _get_phonenumbers()
         return phonenumbers.format_number(
             phone, 
-            PhoneNumberFormat.INTERNATIONAL
+            phonenumbers.PhoneNumberFormat.INTERNATIONAL
         )
     
     def get_country_emoji(self, country_code: str) -> str:
@@ -397,8 +563,14 @@ class CountryDetector:
         Returns:
             Country emoji or default globe emoji
         """
-        country_name = self.COUNTRY_CODES.get(country_code, "")
-        return self.COUNTRY_EMOJIS.get(country_name, "🌍")
+        code_emojis = self._code_emojis()
+        emoji = code_emojis.get(country_code)
+        if emoji is not None:
+            return emoji
+        
+        # Partial or un-prefixed codes go through the prefix trie
+        match = self._match_prefix(country_code.lstrip("+"))
+        return code_emojis[match[0]] if match else "🌍"
     
     def validate_number(self, phone_number: str) -> bool:
         """
@@ -414,24 +586,23 @@ class CountryDetector:
         return result["is_valid"]
 
 
-# Singleton instance
-_country_detector: Optional[CountryDetector] = None
+@functools.lru_cache(maxsize=8)
+def _detector_for(language: str) -> CountryDetector:
+    """Create (once) the detector for a language."""
+    return CountryDetector(language)
 
 
 def get_country_detector(language: str = "en") -> CountryDetector:
     """
-    Get the country detector singleton instance.
+    Get the shared country detector instance for a language.
     
     Args:
         language: Language for country names
         
     Returns:
-        CountryDetector instance
+        CountryDetector instance (one per language)
     """
-    global _country_detector
-    if _country_detector is None:
-        _country_detector = CountryDetector(language)
-    return _country_detector
+    return _detector_for(language)
 
 
 def get_country_info(phone_number: str) -> dict:
@@ -455,9 +626,9 @@ def get_country_from_phone(phone_number: str) -> str:
 
 
 def get_country_code(phone_number: str) -> str:
-    """Get country code from phone number."""
+    """Get country code from phone number ("" if the number is invalid)."""
     info = get_country_info(phone_number)
-    return info.get("country_code", "")
+    return info["country_code"]
 
 
 def is_valid_phone(phone_number: str) -> bool:
@@ -482,3 +653,32 @@ def format_phone_display(phone_number: str) -> str:
     """Format phone number for display."""
     info = get_country_info(phone_number)
     return info.get("formatted", phone_number)
+
+
+if __name__ == '__main__':
+    # Regression checks for the dialing code table
+    detector = get_country_detector()
+    
+    # +262's main region is Reunion, not Mayotte
+    for number in ("+262692123456", "+262262161234"):
+        info = detector.detect(number)
+        assert info["country_name"] == "Reunion", (number, info)
+    
+    # detect() names a mobile number of every table code like libphonenumber
+    phonenumbers, geocoder = _get_phonenumbers()
+    for code in CountryDetector.COUNTRY_CODES:
+        region = phonenumbers.region_code_for_country_code(int(code[1:]))
+        example = phonenumbers.example_number_for_type(region, phonenumbers.PhoneNumberType.MOBILE)
+        if example is None:
+            continue
+        
+        # Shared codes (e.g. +39 Italy/Vatican) have no country-level name
+        expected = geocoder.country_name_for_number(example, "en")
+        if not expected:
+            continue
+        
+        number = phonenumbers.format_number(example, phonenumbers.PhoneNumberFormat.E164)
+        name = detector.detect(number)["country_name"]
+        assert name.casefold() == expected.casefold(), (code, name, expected)
+    
+    print("Country detection checks passed")
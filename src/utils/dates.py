@@ -1,29 +1,64 @@
 # Telegram Account Management Bot - Date Handling Utility
 # Handle date formatting and parsing for account categorization
 
+import functools
+import time
 from datetime import datetime, date
 from typing import Tuple, Optional
 from pathlib import Path
 
 
-def get_today_date() -> str:
+# Supported display formats mapped to their strftime equivalents
+_FORMAT_MAP = {
+    'YYYY/MM/DD': '%Y/%m/%d',
+    'YYYY-MM-DD': '%Y-%m-%d',
+    'DD/MM/YYYY': '%d/%m/%Y',
+    'MM/DD/YYYY': '%m/%d/%Y',
+    'YYYY': '%Y',
+    'MM': '%m',
+    'DD': '%d',
+}
+
+# Root of the date-organized session tree
+_SESSIONS_BASE = Path(__file__).parent.parent.parent / 'data' / 'sessions'
+
+# (monotonic timestamp, today's ordinal) shared by consecutive relative-date lookups
+_TODAY_TTL = 60.0
+_today_cache: Tuple[float, int] = (float('-inf'), 0)
+
+
+def get_today_parts(now: Optional[datetime] = None) -> Tuple[str, str, str, str]:
+    """
+    Get today's date and its components from a single clock read.
+    
+    Args:
+        now: Optional datetime to use instead of reading the UTC clock
+        
+    Returns:
+        Tuple of (YYYY-MM-DD, YYYY, MM, DD) strings
+    """
+    iso = (now or datetime.utcnow()).strftime('%Y-%m-%d')
+    return iso, iso[:4], iso[5:7], iso[8:10]
+
+
+def get_today_date(now: Optional[datetime] = None) -> str:
     """Get today's date in YYYY-MM-DD format"""
-    return datetime.utcnow().strftime('%Y-%m-%d')
+    return get_today_parts(now)[0]
 
 
-def get_current_year() -> str:
+def get_current_year(now: Optional[datetime] = None) -> str:
     """Get current year as string"""
-    return str(datetime.utcnow().year)
+    return get_today_parts(now)[1]
 
 
-def get_current_month() -> str:
+def get_current_month(now: Optional[datetime] = None) -> str:
     """Get current month as zero-padded string"""
-    return str(datetime.utcnow().month).zfill(2)
+    return get_today_parts(now)[2]
 
 
-def get_current_day() -> str:
+def get_current_day(now: Optional[datetime] = None) -> str:
     """Get current day as zero-padded string"""
-    return str(datetime.utcnow().day).zfill(2)
+    return get_today_parts(now)[3]
 
 
 def format_date(input_date: date, format: str = 'YYYY/MM/DD') -> str:
@@ -37,28 +72,10 @@ def format_date(input_date: date, format: str = 'YYYY/MM/DD') -> str:
     Returns:
         Formatted date string
     """
-    year = str(input_date.year)
-    month = str(input_date.month).zfill(2)
-    day = str(input_date.day).zfill(2)
-    
-    if format == 'YYYY/MM/DD':
-        return f"{year}/{month}/{day}"
-    elif format == 'YYYY-MM-DD':
-        return f"{year}-{month}-{day}"
-    elif format == 'DD/MM/YYYY':
-        return f"{day}/{month}/{year}"
-    elif format == 'MM/DD/YYYY':
-        return f"{month}/{day}/{year}"
-    elif format == 'YYYY':
-        return year
-    elif format == 'MM':
-        return month
-    elif format == 'DD':
-        return day
-    else:
-        return f"{year}-{month}-{day}"
+    return input_date.strftime(_FORMAT_MAP.get(format, '%Y-%m-%d'))
 
 
+@functools.lru_cache(maxsize=1024)
 def parse_date_string(date_str: str) -> Optional[date]:
     """
     Parse a date string in various formats.
@@ -75,13 +92,26 @@ def parse_date_string(date_str: str) -> Optional[date]:
     Returns:
         Date object or None if parsing fails
     """
-    formats = [
-        '%Y-%m-%d',
-        '%Y/%m/%d',
-        '%d/%m/%Y',
-        '%m/%d/%Y',
-        '%Y%m%d',
-    ]
+    # Fast path for the canonical YYYY-MM-DD format
+    if (len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-'
+            and date_str[:4].isdigit() and date_str[5:7].isdigit() and date_str[8:10].isdigit()):
+        try:
+            return date(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10]))
+        except ValueError:
+            pass
+    
+    # Pick the candidate formats from the separator instead of trying them all
+    if '-' in date_str:
+        formats = ('%Y-%m-%d',)
+    elif '/' in date_str:
+        if date_str[:4].isdigit():
+            formats = ('%Y/%m/%d',)
+        else:
+            formats = ('%d/%m/%Y', '%m/%d/%Y')
+    elif date_str.isdigit():
+        formats = ('%Y%m%d',)
+    else:
+        return None
     
     for fmt in formats:
         try:
@@ -126,8 +156,7 @@ def create_date_path(year: str, month: str, day: str) -> Path:
     Returns:
         Path object for the date directory
     """
-    base_dir = Path(__file__).parent.parent.parent / 'data' / 'sessions'
-    return base_dir / year / month / day
+    return _SESSIONS_BASE / year / month / day
 
 
 def get_date_range(start_date: date, end_date: date) -> list:
@@ -141,16 +170,10 @@ def get_date_range(start_date: date, end_date: date) -> list:
     Returns:
         List of dates in the range
     """
-    dates = []
-    current = start_date
-    
-    while current <= end_date:
-        dates.append(current)
-        current = date.fromordinal(current.toordinal() + 1)
-    
-    return dates
+    return [date.fromordinal(o) for o in range(start_date.toordinal(), end_date.toordinal() + 1)]
 
 
+@functools.lru_cache(maxsize=1024)
 def format_date_for_display(date_str: str) -> str:
     """
     Format a date string for human-readable display.
@@ -179,13 +202,28 @@ def get_relative_date(date_str: str) -> str:
     Returns:
         Relative date description (e.g., "Today", "Yesterday", "3 days ago")
     """
+    return _relative_date(date_str, _get_today_ordinal())
+
+
+def _get_today_ordinal() -> int:
+    """Today's ordinal, re-read from the clock at most once per _TODAY_TTL."""
+    global _today_cache
+    
+    now = time.monotonic()
+    if now - _today_cache[0] > _TODAY_TTL:
+        _today_cache = (now, date.today().toordinal())
+    return _today_cache[1]
+
+
+@functools.lru_cache(maxsize=1024)
+def _relative_date(date_str: str, today_ordinal: int) -> str:
+    """Relative date description for date_str as seen from today_ordinal."""
     parsed = parse_date_string(date_str)
     
     if not parsed:
         return date_str
     
-    today = date.today()
-    delta = (today - parsed).days
+    delta = today_ordinal - parsed.toordinal()
     
     if delta == 0:
         return "Today"
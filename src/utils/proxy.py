@@ -1,17 +1,32 @@
 # Telegram Account Management Bot - SOCKS5 Proxy Utility
 # Handle proxy validation and configuration
 
+import asyncio
+import functools
+import ipaddress
 import re
-from typing import Optional, Tuple
-from urllib.parse import urlparse
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
 
-# SOCKS5 proxy regex patterns
-SOCKS5_PATTERN = re.compile(
-    r'^(?:(?P<scheme>socks5)://)?'
-    r'(?:(?P<user>[^:]+):(?P<pass>[^@]+)@)?'
-    r'(?P<host>[^:]+):(?P<port>\d+)$',
-    re.IGNORECASE
-)
+# Domain name hosts (IP addresses are checked with ipaddress)
+_DOMAIN_RE = re.compile(r'[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z]{2,})+')
+
+
+@dataclass(slots=True, frozen=True)
+class ProxyConfig:
+    """Parsed SOCKS5 proxy configuration."""
+    scheme: str
+    host: str
+    port: int
+    username: Optional[str] = None
+    password: Optional[str] = None
+
+
+# Recent test_proxy_connection verdicts: (host, port, username) -> (checked_at, ok, message)
+_TEST_CACHE: dict = {}
+_TEST_CACHE_TTL = 30.0
+_TEST_CACHE_MAX = 256
 
 
 def validate_proxy(host: str, port: int, username: Optional[str] = None, password: Optional[str] = None) -> Tuple[bool, str]:
@@ -27,43 +42,58 @@ def validate_proxy(host: str, port: int, username: Optional[str] = None, passwor
     Returns:
         Tuple of (is_valid, error_message)
     """
+    # Common case: everything valid, checked in one expression
+    if (host and len(host) <= 255
+            and 1 <= port <= 65535
+            and (not username or (len(username) <= 255 and ':' not in username))
+            and (not password or len(password) <= 255)
+            and _is_valid_host(host)):
+        return True, ""
+    
+    return False, _proxy_error(host, port, username, password)
+
+
+def _proxy_error(host: str, port: int, username: Optional[str], password: Optional[str]) -> str:
+    """Message for the first failing check of an invalid proxy configuration."""
     # Validate host
     if not host or len(host) < 1:
-        return False, "Host cannot be empty"
+        return "Host cannot be empty"
     
     if len(host) > 255:
-        return False, "Host name is too long"
+        return "Host name is too long"
     
     # Check for valid IP or domain
-    ip_pattern = re.compile(
-        r'^(\d{1,3}\.){3}\d{1,3}$'
-    )
-    domain_pattern = re.compile(
-        r'^[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z]{2,})+$'
-    )
-    
-    if not (ip_pattern.match(host) or domain_pattern.match(host)):
-        return False, "Invalid host format"
+    if not _is_valid_host(host):
+        return "Invalid host format"
     
     # Validate port
     if not (1 <= port <= 65535):
-        return False, "Port must be between 1 and 65535"
+        return "Port must be between 1 and 65535"
     
     # Validate credentials if provided
     if username:
         if len(username) > 255:
-            return False, "Username is too long"
+            return "Username is too long"
         if ':' in username:
-            return False, "Username cannot contain colons"
+            return "Username cannot contain colons"
     
     if password:
         if len(password) > 255:
-            return False, "Password is too long"
+            return "Password is too long"
     
-    return True, ""
+    return ""
+
+
+def _is_valid_host(host: str) -> bool:
+    """Check that host is an IPv4/IPv6 address or a domain name."""
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return _DOMAIN_RE.fullmatch(host) is not None
 
 
-def parse_proxy_string(proxy_string: str) -> Optional[dict]:
+def parse_proxy_string(proxy_string: str) -> Optional[ProxyConfig]:
     """
     Parse a proxy string in various formats.
     
@@ -77,54 +107,77 @@ def parse_proxy_string(proxy_string: str) -> Optional[dict]:
         proxy_string: Proxy configuration string
         
     Returns:
-        Dictionary with proxy configuration or None if invalid
+        ProxyConfig or None if invalid
     """
     if not proxy_string:
         return None
     
-    # Try SOCKS5 pattern first
-    match = SOCKS5_PATTERN.match(proxy_string.strip())
-    
-    if match:
-        groups = match.groupdict()
-        return {
-            'scheme': groups.get('scheme', 'socks5'),
-            'host': groups['host'],
-            'port': int(groups['port']),
-            'username': groups.get('user'),
-            'password': groups.get('pass')
-        }
-    
-    # Try URL format
-    if '://' in proxy_string:
-        try:
-            parsed = urlparse(proxy_string)
-            
-            if parsed.scheme in ['socks5', 'socks5h']:
-                return {
-                    'scheme': 'socks5',
-                    'host': parsed.hostname,
-                    'port': parsed.port,
-                    'username': parsed.username,
-                    'password': parsed.password
-                }
-        except Exception:
-            pass
+    rest = proxy_string.strip()
     
-    # Try simple host:port format
-    try:
-        host, port = proxy_string.rsplit(':', 1)
-        return {
-            'scheme': 'socks5',
-            'host': host.strip(),
-            'port': int(port.strip()),
-            'username': None,
-            'password': None
-        }
-    except (ValueError, AttributeError):
-        pass
+    # Optional scheme; only SOCKS5 proxies are supported
+    sep = rest.find('://')
+    if sep != -1:
+        if rest[:sep].lower() not in ('socks5', 'socks5h'):
+            return None
+        rest = rest[sep + 3:]
     
-    return None
+    # Optional "username:password@" prefix (the host never contains '@')
+    username = password = None
+    at = rest.rfind('@')
+    if at != -1:
+        username, colon, password = rest[:at].partition(':')
+        if not (colon and username and password):
+            return None
+        rest = rest[at + 1:]
+    
+    # "[ipv6]:port", "host:port", or "host:port:username:password"
+    if rest.startswith('['):
+        close = rest.find(']')
+        if close == -1 or rest[close + 1:close + 2] != ':':
+            return None
+        host, port = rest[1:close], rest[close + 2:]
+    else:
+        parts = rest.split(':')
+        if len(parts) == 2:
+            host, port = parts
+        elif len(parts) == 4 and username is None and sep == -1:
+            host, port, username, password = parts
+            if not (username and password):
+                return None
+        else:
+            return None
+    
+    host = host.strip()
+    port = port.strip()
+    if not host or not port.isdigit():
+        return None
+    
+    return ProxyConfig('socks5', host, int(port), username, password)
+
+
+def validate_proxies_bulk(lines: Iterable[str]) -> Tuple[List[bool], List[ProxyConfig]]:
+    """
+    Parse and validate a list of proxy strings, e.g. an imported proxy file.
+    
+    Args:
+        lines: Proxy configuration strings
+        
+    Returns:
+        Tuple of (validity flag per line, parsed configurations of the valid lines)
+    """
+    flags = []
+    valid = []
+    
+    for line in lines:
+        proxy = parse_proxy_string(line)
+        ok = proxy is not None and validate_proxy(
+            proxy.host, proxy.port, proxy.username, proxy.password
+        )[0]
+        flags.append(ok)
+        if ok:
+            valid.append(proxy)
+    
+    return flags, valid
 
 
 def create_proxy_url(host: str, port: int, username: Optional[str] = None, password: Optional[str] = None) -> str:
@@ -140,79 +193,178 @@ def create_proxy_url(host: str, port: int, username: Optional[str] = None, passw
     Returns:
         Proxy URL string
     """
+    # IPv6 literals need brackets to be told apart from the port
+    if ':' in host:
+        host = f"[{host}]"
+    
     if username and password:
         return f"socks5://{username}:{password}@{host}:{port}"
     else:
         return f"socks5://{host}:{port}"
 
 
-def parse_telethon_proxy(proxy_dict: dict) -> dict:
+def parse_telethon_proxy(proxy: ProxyConfig) -> tuple:
     """
     Parse proxy configuration for Telethon.
     
     Telethon expects: (proxy_type, proxy_addr, port, rdns, username, password)
     
     Args:
-        proxy_dict: Proxy configuration dictionary
+        proxy: Proxy configuration
         
     Returns:
         Telethon-compatible proxy tuple
     """
+    return _telethon_tuple(proxy.host, proxy.port, proxy.username, proxy.password)
+
+
+@functools.lru_cache(maxsize=1024)
+def _telethon_tuple(host: str, port: int, username: Optional[str], password: Optional[str]) -> tuple:
+    """Shared Telethon proxy tuple per proxy, reused across client reconnects."""
     return (
         'socks5',  # proxy type
-        proxy_dict.get('host', ''),
-        proxy_dict.get('port', 1080),
+        host,
+        port,
         True,  # rdns
-        proxy_dict.get('username'),
-        proxy_dict.get('password')
+        username,
+        password
     )
 
 
-def parse_pyrogram_proxy(proxy_dict: dict) -> dict:
+def parse_pyrogram_proxy(proxy: ProxyConfig) -> dict:
     """
     Parse proxy configuration for Pyrogram.
     
     Pyrogram expects: {"scheme": "socks5", "hostname": "...", "port": ..., ...}
     
     Args:
-        proxy_dict: Proxy configuration dictionary
+        proxy: Proxy configuration
         
     Returns:
         Pyrogram-compatible proxy dictionary
     """
     return {
         'scheme': 'socks5',
-        'hostname': proxy_dict.get('host', ''),
-        'port': proxy_dict.get('port', 1080),
-        'username': proxy_dict.get('username'),
-        'password': proxy_dict.get('password')
+        'hostname': proxy.host,
+        'port': proxy.port,
+        'username': proxy.username,
+        'password': proxy.password
     }
 
 
-def test_proxy_connection(proxy_dict: dict, timeout: float = 5.0) -> Tuple[bool, str]:
+def test_proxy_connection(proxy: ProxyConfig, timeout: float = 5.0, force: bool = False) -> Tuple[bool, str]:
     """
     Test if a proxy is reachable.
     
+    Results are cached for a short time per (host, port, username), so
+    repeated checks of the same proxy do not reconnect.
+    
     Args:
-        proxy_dict: Proxy configuration dictionary
+        proxy: Proxy configuration
         timeout: Connection timeout in seconds
+        force: Ignore any cached result and test again
         
     Returns:
         Tuple of (is_reachable, message)
     """
     import socket
     
-    host = proxy_dict.get('host')
-    port = proxy_dict.get('port', 1080)
+    host = proxy.host
+    port = proxy.port
+    
+    key = (host, port, proxy.username)
+    now = time.monotonic()
+    if not force:
+        cached = _get_cached_test(key, now)
+        if cached is not None:
+            return cached
     
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        sock.connect((host, port))
-        sock.close()
-        return True, f"Proxy {host}:{port} is reachable"
+        # create_connection resolves the address family (IPv4 or IPv6)
+        with socket.create_connection((host, port), timeout):
+            pass
+        result = True, f"Proxy {host}:{port} is reachable"
     except socket.error as e:
-        return False, f"Failed to connect to proxy: {e}"
+        result = False, f"Failed to connect to proxy: {e}"
+    
+    _store_test(key, now, result)
+    return result
+
+
+async def test_proxy_connection_async(proxy: ProxyConfig, timeout: float = 5.0, force: bool = False) -> Tuple[bool, str]:
+    """
+    Test if a proxy is reachable without blocking the event loop.
+    
+    Shares the result cache with test_proxy_connection.
+    
+    Args:
+        proxy: Proxy configuration
+        timeout: Connection timeout in seconds
+        force: Ignore any cached result and test again
+        
+    Returns:
+        Tuple of (is_reachable, message)
+    """
+    host = proxy.host
+    port = proxy.port
+    
+    key = (host, port, proxy.username)
+    now = time.monotonic()
+    if not force:
+        cached = _get_cached_test(key, now)
+        if cached is not None:
+            return cached
+    
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.close()
+        await writer.wait_closed()
+        result = True, f"Proxy {host}:{port} is reachable"
+    except asyncio.TimeoutError:
+        result = False, "Failed to connect to proxy: timed out"
+    except OSError as e:
+        result = False, f"Failed to connect to proxy: {e}"
+    
+    _store_test(key, now, result)
+    return result
+
+
+async def test_proxies_bulk(proxies: Iterable[ProxyConfig], timeout: float = 5.0, concurrency: int = 200) -> List[Tuple[bool, str]]:
+    """
+    Test many proxies concurrently.
+    
+    Args:
+        proxies: Proxy configurations
+        timeout: Per-proxy connection timeout in seconds
+        concurrency: Maximum number of connections open at once
+        
+    Returns:
+        List of (is_reachable, message) tuples, in the order of proxies
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def _test(proxy: ProxyConfig) -> Tuple[bool, str]:
+        async with semaphore:
+            return await test_proxy_connection_async(proxy, timeout)
+    
+    return await asyncio.gather(*(_test(p) for p in proxies))
+
+
+def _get_cached_test(key: tuple, now: float) -> Optional[Tuple[bool, str]]:
+    """Return a cached test verdict younger than _TEST_CACHE_TTL, if any."""
+    entry = _TEST_CACHE.get(key)
+    if entry and now - entry[0] < _TEST_CACHE_TTL:
+        return entry[1], entry[2]
+    return None
+
+
+def _store_test(key: tuple, now: float, result: Tuple[bool, str]) -> None:
+    """Cache a test verdict, evicting the oldest entry over _TEST_CACHE_MAX."""
+    # Re-insert so dict order tracks age, then evict the oldest over the cap
+    _TEST_CACHE.pop(key, None)
+    _TEST_CACHE[key] = (now, *result)
+    if len(_TEST_CACHE) > _TEST_CACHE_MAX:
+        del _TEST_CACHE[next(iter(_TEST_CACHE))]
 
 
 if __name__ == '__main__':
@@ -232,9 +384,9 @@ if __name__ == '__main__':
         
         if result:
             valid, msg = validate_proxy(
-                result['host'],
-                result['port'],
-                result.get('username'),
-                result.get('password')
+                result.host,
+                result.port,
+                result.username,
+                result.password
             )
             print(f"Valid: {valid} - {msg}")
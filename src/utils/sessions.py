@@ -1,6 +1,7 @@
 # Telegram Account Management Bot - Session Export Utility
 # Handle exporting Telegram sessions for Telethon and Pyrogram
 
+import io
 import os
 import zipfile
 import shutil
@@ -13,15 +14,71 @@ from datetime import datetime
 TELETHON_EXT = '.session'
 PYROGRAM_EXT = '.session'
 
+# Export format -> extension of the exported session file
+_FORMAT_EXTS = {
+    'telethon': TELETHON_EXT,
+    'pyrogram': PYROGRAM_EXT,
+}
+
+
+# Suffixes appended to a session path to get it and its associated files
+_SESSION_FILE_EXTS = ('', '-journal', '.sqlite', '.sqlite3')
+
+# Data directories, resolved once at import
+_DATA_DIR = Path(__file__).parent.parent.parent / 'data'
+_SESSIONS_DIR = _DATA_DIR / 'sessions'
+_EXPORTS_DIR = _DATA_DIR / 'exports'
+
 
 def get_sessions_dir() -> Path:
     """Get the sessions directory path"""
-    return Path(__file__).parent.parent.parent / 'data' / 'sessions'
+    return _SESSIONS_DIR
 
 
 def get_exports_dir() -> Path:
     """Get the exports directory path"""
-    return Path(__file__).parent.parent.parent / 'data' / 'exports'
+    return _EXPORTS_DIR
+
+
+def _copy_file(src: Path, dest: Path) -> None:
+    """
+    Copy a file with its metadata, like shutil.copy2.
+    
+    Uses os.copy_file_range where available, so the data stays in the kernel
+    and exports on the same btrfs/XFS filesystem become copy-on-write
+    reflinks. Falls back to shutil.copy2 when the call is unavailable or
+    refused (e.g. across filesystems on older kernels).
+    
+    Args:
+        src: Source file
+        dest: Destination path
+    """
+    if not hasattr(os, 'copy_file_range'):
+        shutil.copy2(src, dest)
+        return
+    
+    try:
+        src_fd = os.open(src, os.O_RDONLY)
+        try:
+            st = os.fstat(src_fd)
+            dest_fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                remaining = st.st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src_fd, dest_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            finally:
+                os.close(dest_fd)
+        finally:
+            os.close(src_fd)
+    except OSError:
+        # Old kernels and some filesystems refuse copy_file_range
+        shutil.copy2(src, dest)
+        return
+    
+    shutil.copystat(src, dest)
 
 
 def export_telethon_format(session_files: List[Path], output_dir: Path) -> List[Path]:
@@ -42,7 +99,7 @@ def export_telethon_format(session_files: List[Path], output_dir: Path) -> List[
     for session_file in session_files:
         if session_file.exists():
             dest = output_dir / f"{session_file.stem}{TELETHON_EXT}"
-            shutil.copy2(session_file, dest)
+            _copy_file(session_file, dest)
             exported_files.append(dest)
     
     return exported_files
@@ -66,7 +123,7 @@ def export_pyrogram_format(session_files: List[Path], output_dir: Path) -> List[
     for session_file in session_files:
         if session_file.exists():
             dest = output_dir / f"{session_file.stem}{PYROGRAM_EXT}"
-            shutil.copy2(session_file, dest)
+            _copy_file(session_file, dest)
             exported_files.append(dest)
     
     return exported_files
@@ -94,23 +151,22 @@ def export_sessions(
     if count and count > 0:
         session_files = session_files[:count]
     
+    if format.lower() not in _FORMAT_EXTS:
+        raise ValueError(f"Unknown export format: {format}")
+    
     if output_dir is None:
-        exports_dir = get_exports_dir()
-        exports_dir.mkdir(exist_ok=True)
-        
         # Create a timestamped subdirectory for this export
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_dir = exports_dir / f"export_{timestamp}"
+        output_dir = _EXPORTS_DIR / f"export_{timestamp}"
     
-    output_dir.mkdir(exist_ok=True)
+    # One mkdir also creates the exports directory when needed
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     # Export in the specified format
     if format.lower() == 'telethon':
         exported = export_telethon_format(session_files, output_dir)
-    elif format.lower() == 'pyrogram':
-        exported = export_pyrogram_format(session_files, output_dir)
     else:
-        raise ValueError(f"Unknown export format: {format}")
+        exported = export_pyrogram_format(session_files, output_dir)
     
     return output_dir, exported
 
@@ -119,57 +175,67 @@ def export_sessions_zip(
     session_files: List[Path],
     format: str = 'telethon',
     count: Optional[int] = None,
-    include_stats: bool = False
-) -> Path:
+    include_stats: bool = False,
+    compression: int = zipfile.ZIP_STORED
+) -> io.BytesIO:
     """
-    Export session files as a ZIP archive.
+    Export session files as an in-memory ZIP archive.
+    
+    The archive is never written to disk; it is meant to be uploaded
+    straight to the user. Its file name is available as the buffer's
+    ``name`` attribute.
     
     Args:
         session_files: List of session file paths to export
         format: Export format ('telethon' or 'pyrogram')
         count: Maximum number of sessions to export (None for all)
         include_stats: Include statistics file in the archive
+        compression: zipfile compression method (sessions are stored
+            uncompressed by default; pass zipfile.ZIP_DEFLATED to shrink them)
         
     Returns:
-        Path to the ZIP file
+        BytesIO positioned at the start of the ZIP data
     """
     # Limit count if specified
     if count and count > 0:
         session_files = session_files[:count]
     
-    exports_dir = get_exports_dir()
-    exports_dir.mkdir(exist_ok=True)
+    ext = _FORMAT_EXTS.get(format.lower())
+    if ext is None:
+        raise ValueError(f"Unknown export format: {format}")
     
-    # Create a temporary directory for export
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        
-        # Export sessions
-        output_dir, exported = export_sessions(session_files, format, count, temp_path)
+    # Archive name -> source file; on a name clash the last file wins,
+    # as it did when sessions were copied into one directory first
+    exported = {
+        f"{session_file.stem}{ext}": session_file
+        for session_file in session_files
+        if session_file.exists()
+    }
+    
+    # Create ZIP archive straight from the session files
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    zip_buffer = io.BytesIO()
+    zip_buffer.name = f"telegram_accounts_{format}_{timestamp}.zip"
+    
+    with zipfile.ZipFile(zip_buffer, 'w', compression) as zipf:
+        for arcname, session_file in exported.items():
+            zipf.write(session_file, arcname)
         
         # Include statistics if requested
         if include_stats:
-            stats_file = output_dir / 'stats.txt'
-            with open(stats_file, 'w') as f:
-                f.write(f"Export Date: {datetime.now().isoformat()}\n")
-                f.write(f"Format: {format}\n")
-                f.write(f"Total Sessions: {len(exported)}\n")
-                f.write(f"\nSession Files:\n")
-                for i, file in enumerate(exported, 1):
-                    f.write(f"  {i}. {file.name}\n")
-        
-        # Create ZIP file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        zip_name = f"telegram_accounts_{format}_{timestamp}.zip"
-        zip_path = exports_dir / zip_name
-        
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file_path in output_dir.rglob('*'):
-                if file_path.is_file():
-                    arcname = file_path.name
-                    zipf.write(file_path, arcname)
-        
-        return zip_path
+            lines = [
+                f"Export Date: {now.isoformat()}",
+                f"Format: {format}",
+                f"Total Sessions: {len(exported)}",
+                "",
+                "Session Files:",
+            ]
+            lines += [f"  {i}. {name}" for i, name in enumerate(exported, 1)]
+            zipf.writestr('stats.txt', "\n".join(lines) + "\n")
+    
+    zip_buffer.seek(0)
+    return zip_buffer
 
 
 def get_user_sessions(user_id: int) -> List[Path]:
@@ -182,16 +248,18 @@ def get_user_sessions(user_id: int) -> List[Path]:
     Returns:
         List of session file paths
     """
-    sessions_dir = get_sessions_dir()
+    sessions_dir = _SESSIONS_DIR
     sessions_dir.mkdir(exist_ok=True)
     
     # Find session files for this user
+    # scandir's entries carry the file type, so is_file() needs no extra stat
     user_prefix = f"user_{user_id}_"
-    session_files = []
-    
-    for file in sessions_dir.glob('*'):
-        if file.is_file() and file.name.startswith(user_prefix):
-            session_files.append(file)
+    with os.scandir(sessions_dir) as entries:
+        session_files = [
+            Path(entry.path)
+            for entry in entries
+            if entry.name.startswith(user_prefix) and entry.is_file()
+        ]
     
     return sorted(session_files)
 
@@ -206,14 +274,14 @@ def delete_session(session_file: Path) -> bool:
     Returns:
         True if deleted successfully
     """
+    base = os.fspath(session_file)
     try:
-        if session_file.exists():
-            session_file.unlink()
-            # Also delete associated files (.session-journal, etc.)
-            for ext in ['-journal', '.sqlite', '.sqlite3']:
-                alt_file = session_file.with_suffix(session_file.suffix + ext)
-                if alt_file.exists():
-                    alt_file.unlink()
+        # Also delete associated files (.session-journal, etc.)
+        for ext in _SESSION_FILE_EXTS:
+            try:
+                os.unlink(base + ext)
+            except FileNotFoundError:
+                pass
         return True
     except Exception:
         return False
@@ -229,14 +297,22 @@ def get_session_info(session_file: Path) -> dict:
     Returns:
         Dictionary with session information
     """
-    info = {
+    try:
+        st = os.stat(session_file)
+    except FileNotFoundError:
+        return {
+            'name': session_file.name,
+            'size': 0,
+            'modified': None,
+            'exists': False
+        }
+    
+    return {
         'name': session_file.name,
-        'size': session_file.stat().st_size if session_file.exists() else 0,
-        'modified': datetime.fromtimestamp(session_file.stat().st_mtime).isoformat() if session_file.exists() else None,
-        'exists': session_file.exists()
+        'size': st.st_size,
+        'modified': datetime.fromtimestamp(st.st_mtime).isoformat(),
+        'exists': True
     }
-    
-    return info
 
 
 if __name__ == '__main__':
@@ -258,8 +334,6 @@ if __name__ == '__main__':
         session_files = list(sessions_dir.glob('*.session'))
         print(f"Created {len(session_files)} test sessions")
         
-        zip_path = export_sessions_zip(session_files, 'telethon', count=2)
-        print(f"Exported to: {zip_path}")
-        
-        if zip_path.exists():
-            print(f"ZIP file size: {zip_path.stat().st_size} bytes")
+        zip_buffer = export_sessions_zip(session_files, 'telethon', count=2)
+        print(f"Exported: {zip_buffer.name}")
+        print(f"ZIP size: {zip_buffer.getbuffer().nbytes} bytes")